@@ -1,16 +1,14 @@
-import streamlit as st
-import numpy as np
-import pandas as pd
-from optimizer import optimize_cutting
-from visualizer import visualize_cutting_pattern
-import streamlit as st
-import numpy as np
-import pandas as pd
-from optimizer import optimize_cutting
-from visualizer import visualize_cutting_pattern
-from matplotlib.backends.backend_pdf import PdfPages
+# Heavy imports (numpy, pandas, the solver and the matplotlib-backed
+# visualizer) are deferred into the branches that need them so the first
+# page load doesn't pay their import cost; Python caches modules, so each
+# deferred import only costs once per worker
 import io
 import base64
+import hashlib
+import pickle
+from pathlib import Path
+
+import streamlit as st
 
 st.set_page_config(
     page_title="Material Cutting Optimizer",
@@ -18,6 +16,105 @@ st.set_page_config(
     layout="wide"
 )
 
+# On-disk tier of the solver memo: survives worker restarts and is shared
+# across sessions, which suits the "same roll, same standard cut sizes"
+# usage pattern. Anchored to this file so the cache always lands under
+# the repo's ignored .cache/ directory, not under whatever directory the
+# app happens to be launched from.
+_DISK_CACHE_DIR = Path(__file__).resolve().parent / ".cache" / "cuts"
+_DISK_CACHE_MAX_BYTES = 8 * 1024 * 1024
+
+def _disk_cache_get(key):
+    """Return the cached (placements, waste) tuple for key, or None."""
+    path = _DISK_CACHE_DIR / f"{key}.pkl"
+    try:
+        with open(path, "rb") as f:
+            return pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+
+def _disk_cache_put(key, value):
+    """Store value under key, evicting oldest entries past the size cap."""
+    try:
+        _DISK_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        with open(_DISK_CACHE_DIR / f"{key}.pkl", "wb") as f:
+            pickle.dump(value, f)
+
+        # Evict oldest entries while the cache exceeds its size cap
+        entries = sorted(
+            _DISK_CACHE_DIR.glob("*.pkl"), key=lambda p: p.stat().st_mtime
+        )
+        total = sum(p.stat().st_size for p in entries)
+        while entries and total > _DISK_CACHE_MAX_BYTES:
+            oldest = entries.pop(0)
+            total -= oldest.stat().st_size
+            oldest.unlink()
+    except OSError:
+        # A read-only or full filesystem only disables persistence
+        pass
+
+@st.cache_data(max_entries=64)
+def _cached_optimize(roll_width_cm, roll_length_cm, pieces_tuple, force_horizontal):
+    """
+    Memoized wrapper around the solver so identical inputs skip the packing run.
+
+    Two tiers: st.cache_data holds results in RAM for this worker, and a
+    pickle file cache persists them across restarts.
+    """
+    import numpy as np
+    from optimizer import optimize_cutting
+
+    key = hashlib.blake2b(
+        repr((roll_width_cm, roll_length_cm, pieces_tuple, force_horizontal)).encode()
+    ).hexdigest()
+    cached = _disk_cache_get(key)
+    if cached is not None:
+        return cached
+
+    # Hand the solver one contiguous typed array instead of a list of
+    # tuples, so its numeric loops work on unboxed float data
+    pieces_arr = np.ascontiguousarray(pieces_tuple, dtype=np.float64).reshape(-1, 3)
+    result = optimize_cutting(
+        roll_width_cm, roll_length_cm, pieces_arr,
+        force_horizontal=force_horizontal
+    )
+    _disk_cache_put(key, result)
+    return result
+
+# Below this piece count a parallel multi-start is not worth the pool
+# spawn cost, so the plain single-pass solver is used instead
+_MULTI_START_MIN_PIECES = 20
+
+@st.cache_data(max_entries=16)
+def _cached_optimize_multistart(roll_width_cm, roll_length_cm, pieces_tuple, force_horizontal):
+    """Memoized wrapper around the parallel multi-start solver."""
+    import numpy as np
+    from optimizer import optimize_cutting_multistart
+
+    pieces_arr = np.ascontiguousarray(pieces_tuple, dtype=np.float64).reshape(-1, 3)
+    return optimize_cutting_multistart(
+        roll_width_cm, roll_length_cm, pieces_arr,
+        force_horizontal=force_horizontal
+    )
+
+@st.cache_resource(max_entries=16)
+def _cached_visualization(roll_width_cm, roll_length_cm, placements_tuple, unit):
+    """Memoized figure builder; Figure is a mutable object, so cache_resource."""
+    from visualizer import visualize_cutting_pattern
+
+    return visualize_cutting_pattern(
+        roll_width_cm, roll_length_cm, list(placements_tuple), unit
+    )
+
+@st.cache_resource(max_entries=16)
+def _cached_visualization_plotly(roll_width_cm, roll_length_cm, placements_tuple, unit):
+    """Memoized builder for the interactive on-screen figure."""
+    from visualizer import visualize_cutting_pattern_plotly
+
+    return visualize_cutting_pattern_plotly(
+        roll_width_cm, roll_length_cm, list(placements_tuple), unit
+    )
+
 st.title("✂️ Material Cutting Optimizer")
 st.markdown("""
 This tool helps you maximize material usage by calculating optimal cutting patterns
@@ -57,9 +154,9 @@ with st.sidebar:
     st.header("Piece Specifications")
     st.markdown("Add the pieces you need to cut from the roll")
 
-# Initialize session state for pieces
-if 'pieces' not in st.session_state:
-    st.session_state.pieces = []
+# The pieces DataFrame (stored in cm, one source of truth; display values
+# are derived from the selected unit at render time) is created lazily on
+# the first piece submit so pandas isn't imported for an empty page
 
 # Add piece form
 with st.sidebar:
@@ -104,187 +201,272 @@ with st.sidebar:
             if width_cm > roll_width_cm or length_cm > roll_length_cm:
                 st.error("Piece dimensions cannot exceed roll dimensions!")
             else:
-                st.session_state.pieces.append({
-                    "width": width_cm,
-                    "length": length_cm,
-                    "quantity": quantity,
-                    "width_display": piece_width,
-                    "length_display": piece_length,
-                    "unit": unit
-                })
-                st.success("Piece added!")
-                st.rerun()
+                import pandas as pd
+
+                if 'pieces_df' not in st.session_state:
+                    # Explicit dtypes: a dtype-less empty frame is all
+                    # object, and the first .loc append would upcast
+                    # quantity to float64
+                    st.session_state.pieces_df = pd.DataFrame({
+                        "width_cm": pd.Series(dtype=float),
+                        "length_cm": pd.Series(dtype=float),
+                        "quantity": pd.Series(dtype=int),
+                    })
+                # Assign the row as a dict so each value lands in its own
+                # column; a list row is coerced to one array first, which
+                # would upcast quantity to float64
+                st.session_state.pieces_df.loc[len(st.session_state.pieces_df)] = {
+                    "width_cm": width_cm, "length_cm": length_cm, "quantity": quantity
+                }
+                st.toast("Piece added!")
 
 # Main content area
 col1, col2 = st.columns([1, 2])
 
 # Display pieces table
 with col1:
-    if st.session_state.pieces:
-        st.subheader("Pieces to Cut")
+    if len(st.session_state.get("pieces_df", ())):
+        import numpy as np
+        import pandas as pd
 
-        # Create a DataFrame for display
-        pieces_data = []
-        for i, piece in enumerate(st.session_state.pieces):
-            pieces_data.append({
-                "Piece #": i + 1,
-                "Width": f"{piece['width_display']} {piece['unit']}",
-                "Length": f"{piece['length_display']} {piece['unit']}",
-                "Quantity": piece['quantity']
-            })
+        st.subheader("Pieces to Cut")
 
-        df = pd.DataFrame(pieces_data)
-        st.dataframe(df, use_container_width=True)
+        # Handle mutations before rendering the table so the natural rerun
+        # triggered by the button press already shows fresh data, with no
+        # explicit st.rerun() second pass
+        table_slot = st.empty()
 
         if st.button("Clear All Pieces"):
-            st.session_state.pieces = []
-            st.rerun()
+            st.session_state.pieces_df = st.session_state.pieces_df.iloc[0:0]
 
         if st.button("Remove Last Piece"):
-            if st.session_state.pieces:
-                st.session_state.pieces.pop()
-                st.rerun()
+            if len(st.session_state.pieces_df):
+                st.session_state.pieces_df = st.session_state.pieces_df.iloc[:-1]
+
+        # Derive display columns from the cm values in one vectorized pass
+        pieces_df = st.session_state.pieces_df
+        display_df = pd.DataFrame({
+            "Piece #": np.arange(1, len(pieces_df) + 1),
+            "Width": pieces_df["width_cm"].to_numpy() / conversion,
+            "Length": pieces_df["length_cm"].to_numpy() / conversion,
+            "Quantity": pieces_df["quantity"].to_numpy()
+        })
+        table_slot.dataframe(
+            display_df,
+            use_container_width=True,
+            column_config={
+                "Width": st.column_config.NumberColumn(format=f"%.3f {unit}"),
+                "Length": st.column_config.NumberColumn(format=f"%.3f {unit}")
+            }
+        )
     else:
         st.info("Add pieces to get started")
 
 # Run optimization and show results
-with col2:
-    if st.session_state.pieces:
-        # Prepare data for optimization
-        pieces_for_optimizer = []
-        for piece in st.session_state.pieces:
-            for _ in range(piece["quantity"]):
-                pieces_for_optimizer.append((piece["width"], piece["length"]))
-
-        if st.button("Run Optimization"):
-            with st.spinner("Calculating optimal cutting pattern..."):
-                try:
-                    placements, waste_percentage = optimize_cutting(
-                        roll_width_cm, roll_length_cm, pieces_for_optimizer,
+@st.fragment
+def _results_panel(roll_width_cm, roll_length_cm, pieces_for_optimizer, unit, conversion):
+    """Render the optimization results, isolated from sidebar-driven reruns."""
+    import numpy as np
+    import pandas as pd
+    from matplotlib.backends.backend_pdf import PdfPages
+
+    # Hoist unit-conversion constants; multiplying by the reciprocal is
+    # cheaper than dividing and these factors apply across whole arrays below
+    inv_conv = 1.0 / conversion
+    inv_conv2 = inv_conv * inv_conv
+
+    multi_start = st.checkbox(
+        "High effort (parallel multi-start)",
+        help="Run several seeded packing passes in parallel and keep the "
+             "lowest-waste result. Only applies to larger piece lists."
+    )
+
+    if st.button("Run Optimization"):
+        with st.spinner("Calculating optimal cutting pattern..."):
+            try:
+                # Drop piece types that cannot fit the roll in either
+                # orientation so the solver doesn't waste its search
+                # budget on pieces it can never place
+                pieces_arr = np.asarray(pieces_for_optimizer, dtype=np.float64)
+                fits = (
+                    ((pieces_arr[:, 0] <= roll_width_cm) & (pieces_arr[:, 1] <= roll_length_cm)) |
+                    ((pieces_arr[:, 1] <= roll_width_cm) & (pieces_arr[:, 0] <= roll_length_cm))
+                )
+                if not fits.all():
+                    dropped = int(pieces_arr[~fits, 2].sum())
+                    st.warning(
+                        f"{dropped} pieces don't fit the roll in either "
+                        f"orientation and were skipped."
+                    )
+                    pieces_for_optimizer = [
+                        piece for piece, ok in zip(pieces_for_optimizer, fits) if ok
+                    ]
+
+                total_quantity = sum(q for _, _, q in pieces_for_optimizer)
+                if multi_start and total_quantity > _MULTI_START_MIN_PIECES:
+                    placements, waste_percentage = _cached_optimize_multistart(
+                        roll_width_cm, roll_length_cm,
+                        tuple(sorted(pieces_for_optimizer)),
+                        force_horizontal=True
+                    )
+                else:
+                    placements, waste_percentage = _cached_optimize(
+                        roll_width_cm, roll_length_cm,
+                        tuple(sorted(pieces_for_optimizer)),
                         force_horizontal=True
                     )
 
-                    # Create a metrics display
-                    cols = st.columns(3)
-                    with cols[0]:
-                        st.metric(
-                            "Material Utilization", 
-                            f"{100 - waste_percentage:.3f}%",
-                            f"-{waste_percentage:.3f}% waste"
-                        )
-
-                    with cols[1]:
-                        total_pieces = len(pieces_for_optimizer)
-                        placed_pieces = len(placements)
-                        st.metric(
-                            "Pieces Placed",
-                            f"{placed_pieces}/{total_pieces}",
-                            f"{placed_pieces/total_pieces*100:.1f}% of pieces" if total_pieces > 0 else "0%"
-                        )
-
-                    with cols[2]:
-                        total_area = roll_width_cm * roll_length_cm
-                        waste_area = (total_area - sum(p[2] * p[3] for p in placements)) / conversion**2
-                        st.metric(
-                            f"Waste Area ({unit}²)",
-                            f"{waste_area:.3f}",
-                            f"{waste_area/(total_area/conversion**2)*100:.1f}% of total area"
-                        )
-
-                    # Visualize
-                    fig = visualize_cutting_pattern(
-                        roll_width_cm, roll_length_cm, placements, unit
+                # Build a NumPy view of the placements once and reuse it
+                # for every per-piece statistic below; the used-area reduce
+                # feeds all three metrics so it runs exactly once
+                placements_np = np.asarray(placements, dtype=np.float64).reshape(-1, 4)
+                used_area = float((placements_np[:, 2] * placements_np[:, 3]).sum())
+                total_area = roll_width_cm * roll_length_cm
+                total_pieces = total_quantity
+                placed_pieces = len(placements)
+                waste_area = (total_area - used_area) * inv_conv2
+
+                # Create a metrics display
+                cols = st.columns(3)
+                with cols[0]:
+                    st.metric(
+                        "Material Utilization",
+                        f"{100 - waste_percentage:.3f}%",
+                        f"-{waste_percentage:.3f}% waste"
+                    )
+
+                with cols[1]:
+                    st.metric(
+                        "Pieces Placed",
+                        f"{placed_pieces}/{total_pieces}",
+                        f"{placed_pieces/total_pieces*100:.1f}% of pieces" if total_pieces > 0 else "0%"
                     )
-                    st.pyplot(fig)
+
+                with cols[2]:
+                    st.metric(
+                        f"Waste Area ({unit}²)",
+                        f"{waste_area:.3f}",
+                        f"{waste_area/(total_area*inv_conv2)*100:.1f}% of total area"
+                    )
+
+                # Visualize interactively on screen; the matplotlib figure
+                # is still built below for the PDF export
+                plotly_fig = _cached_visualization_plotly(
+                    roll_width_cm, roll_length_cm, tuple(placements), unit
+                )
+                st.plotly_chart(plotly_fig, use_container_width=True)
+
+                fig = _cached_visualization(
+                    roll_width_cm, roll_length_cm, tuple(placements), unit
+                )
 # Create PDF download button with custom styling
-                    pdf_buffer = io.BytesIO()
-                    with PdfPages(pdf_buffer) as pdf:
-                        pdf.savefig(fig)
-                    
-                    pdf_bytes = pdf_buffer.getvalue()
-                    b64_pdf = base64.b64encode(pdf_bytes).decode()
-                    
-                    # Create styled download button
-                    st.markdown(
-                        f"""
-                        <div style="text-align: center; margin: 20px 0;">
-                            <a href="data:application/pdf;base64,{b64_pdf}" 
-                               download="cutting_pattern.pdf"
-                               style="
-                                   text-decoration: none;
-                                   background-color: #0066cc;
-                                   color: white;
-                                   padding: 12px 20px;
-                                   border-radius: 5px;
-                                   font-weight: bold;
-                                   display: inline-flex;
-                                   align-items: center;
-                                   gap: 8px;
-                               ">
-                                <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
-                                    <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/>
-                                    <polyline points="7 10 12 15 17 10"/>
-                                    <line x1="12" y1="15" x2="12" y2="3"/>
-                                </svg>
-                                Download Cutting Pattern (PDF)
-                            </a>
-                        </div>
-                        """,
-                        unsafe_allow_html=True
+                pdf_buffer = io.BytesIO()
+                with PdfPages(pdf_buffer) as pdf:
+                    pdf.savefig(fig)
+                
+                pdf_bytes = pdf_buffer.getvalue()
+                b64_pdf = base64.b64encode(pdf_bytes).decode()
+                
+                # Create styled download button
+                st.markdown(
+                    f"""
+                    <div style="text-align: center; margin: 20px 0;">
+                        <a href="data:application/pdf;base64,{b64_pdf}" 
+                           download="cutting_pattern.pdf"
+                           style="
+                               text-decoration: none;
+                               background-color: #0066cc;
+                               color: white;
+                               padding: 12px 20px;
+                               border-radius: 5px;
+                               font-weight: bold;
+                               display: inline-flex;
+                               align-items: center;
+                               gap: 8px;
+                           ">
+                            <svg width="24" height="24" viewBox="0 0 24 24" fill="none" stroke="currentColor" stroke-width="2">
+                                <path d="M21 15v4a2 2 0 0 1-2 2H5a2 2 0 0 1-2-2v-4"/>
+                                <polyline points="7 10 12 15 17 10"/>
+                                <line x1="12" y1="15" x2="12" y2="3"/>
+                            </svg>
+                            Download Cutting Pattern (PDF)
+                        </a>
+                    </div>
+                    """,
+                    unsafe_allow_html=True
+                )
+                # Display cutting instructions
+                st.subheader("Cutting Instructions")
+
+                # Group identical pieces with one vectorized unique call
+                # instead of hashing a Python tuple per placement
+                if len(placements_np):
+                    keys, counts = np.unique(
+                        placements_np[:, 2:4], axis=0, return_counts=True
                     )
-                    # Group identical pieces for more organized cutting instructions
-                    from collections import defaultdict
-                    piece_groups = defaultdict(list)
-
-                    for i, (x, y, w, h) in enumerate(placements):
-                        piece_groups[(w, h)].append((i, x, y))
-
-                    # Display cutting instructions
-                    st.subheader("Cutting Instructions")
-
-                    # Show summary table first
-                    summary_data = []
-                    piece_id = 1
-
-                    for (width, height), positions in piece_groups.items():
-                        summary_data.append({
-                            "Type": f"Type {piece_id}",
-                            "Width": f"{width/conversion:.3f} {unit}",
-                            "Length": f"{height/conversion:.3f} {unit}",
-                            "Quantity": len(positions),
-                            "Area": f"{(width*height)/(conversion**2):.3f} {unit}²"
-                        })
-                        piece_id += 1
-
-                    if summary_data:
-                        st.markdown("#### Piece Types Summary")
-                        st.dataframe(pd.DataFrame(summary_data), use_container_width=True)
-
-                    # Show detailed placement instructions
-                    instructions_data = []
-
-                    for i, (x, y, w, h) in enumerate(placements):
-                        instructions_data.append({
-                            "Piece #": i + 1,
-                            "Position X": f"{x/conversion:.3f} {unit}",
-                            "Position Y": f"{y/conversion:.3f} {unit}",
-                            "Width": f"{w/conversion:.3f} {unit}",
-                            "Length": f"{h/conversion:.3f} {unit}"
-                        })
-
-                    if instructions_data:
-                        st.markdown("#### Detailed Placement Coordinates")
-                        st.dataframe(pd.DataFrame(instructions_data), use_container_width=True)
-                    else:
-                        st.warning("No pieces could be placed on the roll.")
-
-                    # Unplaced pieces
-                    unplaced = len(pieces_for_optimizer) - len(placements)
-                    if unplaced > 0:
-                        st.error(f"❗ {unplaced} pieces couldn't be placed on the roll. Consider using a larger roll or adjusting piece dimensions.")
-
-                except Exception as e:
-                    st.error(f"An error occurred: {str(e)}")
+
+                    summary_df = pd.DataFrame({
+                        "Type": [f"Type {i + 1}" for i in range(len(keys))],
+                        "Width": keys[:, 0] * inv_conv,
+                        "Length": keys[:, 1] * inv_conv,
+                        "Quantity": counts,
+                        "Area": keys[:, 0] * keys[:, 1] * inv_conv2
+                    })
+
+                    st.markdown("#### Piece Types Summary")
+                    st.dataframe(
+                        summary_df,
+                        use_container_width=True,
+                        column_config={
+                            "Width": st.column_config.NumberColumn(format=f"%.3f {unit}"),
+                            "Length": st.column_config.NumberColumn(format=f"%.3f {unit}"),
+                            "Area": st.column_config.NumberColumn(format=f"%.3f {unit}²")
+                        }
+                    )
+
+                # Show detailed placement instructions, built column-wise
+                # from the placements array with a single broadcast divide;
+                # unit formatting is deferred to the dataframe column config
+                if len(placements_np):
+                    coords = np.round(placements_np * inv_conv, 3)
+                    instructions_df = pd.DataFrame({
+                        "Piece #": np.arange(1, len(coords) + 1),
+                        "Position X": coords[:, 0],
+                        "Position Y": coords[:, 1],
+                        "Width": coords[:, 2],
+                        "Length": coords[:, 3]
+                    })
+
+                    st.markdown("#### Detailed Placement Coordinates")
+                    st.dataframe(
+                        instructions_df,
+                        use_container_width=True,
+                        column_config={
+                            column: st.column_config.NumberColumn(format=f"%.3f {unit}")
+                            for column in ("Position X", "Position Y", "Width", "Length")
+                        }
+                    )
+                else:
+                    st.warning("No pieces could be placed on the roll.")
+
+                # Unplaced pieces
+                unplaced = total_pieces - placed_pieces
+                if unplaced > 0:
+                    st.error(f"❗ {unplaced} pieces couldn't be placed on the roll. Consider using a larger roll or adjusting piece dimensions.")
+
+            except Exception as e:
+                st.error(f"An error occurred: {str(e)}")
+
+with col2:
+    if len(st.session_state.get("pieces_df", ())):
+        # Prepare data for optimization as (width, length, quantity) triples
+        # so the solver handles multiplicity internally instead of receiving
+        # one tuple per individual piece
+        pieces_for_optimizer = list(
+            st.session_state.pieces_df.itertuples(index=False, name=None)
+        )
+
+        _results_panel(roll_width_cm, roll_length_cm, pieces_for_optimizer, unit, conversion)
     else:
         st.info("Add pieces and click 'Run Optimization' to calculate the optimal cutting pattern")
 
@@ -1,15 +1,96 @@
+import math
+import os
+import random
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+
 import numpy as np
-from collections import defaultdict
 
-def optimize_cutting(roll_width, roll_length, pieces, force_horizontal=False):
+def _normalize_pieces(pieces):
+    """
+    Normalize piece specifications to (width, length, quantity) triples.
+
+    Accepts both the flattened (width, length) form and (width, length,
+    quantity) triples, so callers can pass a quantity per piece type instead
+    of replicating identical tuples.
+
+    Args:
+        pieces (list or np.ndarray): List of (width, length) or
+            (width, length, quantity) tuples, or an (N, 2) / (N, 3) array
+
+    Returns:
+        list: List of (width, length, quantity) triples
+    """
+    if isinstance(pieces, np.ndarray):
+        pieces = pieces.tolist()
+
+    normalized = []
+    for piece in pieces:
+        if len(piece) == 3:
+            width, length, quantity = piece
+        else:
+            width, length = piece
+            quantity = 1
+        normalized.append((width, length, int(quantity)))
+    return normalized
+
+def _multistart_worker(args):
+    """Worker for optimize_cutting_multistart; must be a module-level function."""
+    roll_width, roll_length, pieces, force_horizontal, seed = args
+    return optimize_cutting(
+        roll_width, roll_length, pieces,
+        force_horizontal=force_horizontal, seed=seed
+    )
+
+def optimize_cutting_multistart(roll_width, roll_length, pieces, force_horizontal=False, n_starts=None):
+    """
+    Run several independently seeded optimize_cutting passes in parallel
+    and keep the lowest-waste solution.
+
+    Args:
+        roll_width (float): Width of the roll in cm
+        roll_length (float): Length of the roll in cm
+        pieces (list): Same piece formats as optimize_cutting
+        force_horizontal (bool): Passed through to optimize_cutting
+        n_starts (int): Number of seeded runs; defaults to the CPU count
+
+    Returns:
+        tuple: (placements, waste_percentage) of the best run
+    """
+    if n_starts is None:
+        n_starts = os.cpu_count() or 1
+
+    pieces = _normalize_pieces(pieces)
+
+    # Seed 0 is the deterministic baseline ordering, so the multi-start
+    # result is never worse than a single plain run
+    jobs = [
+        (roll_width, roll_length, pieces, force_horizontal, seed)
+        for seed in range(n_starts)
+    ]
+
+    if n_starts == 1:
+        results = [_multistart_worker(jobs[0])]
+    else:
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+            results = list(executor.map(_multistart_worker, jobs))
+
+    return min(results, key=lambda result: result[1])
+
+def optimize_cutting(roll_width, roll_length, pieces, force_horizontal=False, seed=None):
     """
     Optimize the cutting pattern for a roll of material.
 
     Args:
         roll_width (float): Width of the roll in cm
         roll_length (float): Length of the roll in cm
-        pieces (list): List of tuples (width, length) for each piece in cm
+        pieces (list): List of tuples (width, length) or (width, length, quantity)
+            for each piece type in cm
         force_horizontal (bool): If True, forces pieces to be horizontal and cover full width
+        seed (int): Optional seed that perturbs the placement order, used by
+            optimize_cutting_multistart to diversify runs; None or 0 keeps
+            the deterministic ordering
 
     Returns:
         tuple: (placements, waste_percentage)
@@ -18,21 +99,163 @@ def optimize_cutting(roll_width, roll_length, pieces, force_horizontal=False):
     """
     # If force_horizontal is True, we'll implement a different algorithm
     if force_horizontal:
-        return optimize_horizontal_cutting(roll_width, roll_length, pieces)
+        return optimize_horizontal_cutting(roll_width, roll_length, pieces, seed=seed)
+
+    rng = random.Random(seed) if seed else None
+
+    pieces = _normalize_pieces(pieces)
 
-    # Group identical pieces for more efficient handling
-    piece_counts = defaultdict(int)
-    for width, length in pieces:
-        piece_counts[(width, length)] += 1
+    # Group identical pieces for more efficient handling; quantities are
+    # explicit, so the Counter is updated per type rather than built from
+    # repeated tuples
+    piece_counts = Counter()
+    for width, length, quantity in pieces:
+        piece_counts[(width, length)] += quantity
 
-    # Convert to format that includes all information: (id, width, length, quantity, area)
+    # Convert to format that includes all information: [id, width, length, quantity, area].
+    # Entries are mutable lists shared with the by-dimension lookup below,
+    # so quantity updates never need a linear rescan of the list.
     all_pieces = []
     for i, ((w, l), count) in enumerate(piece_counts.items()):
-        all_pieces.append((i, w, l, count, w * l))
+        all_pieces.append([i, w, l, count, w * l])
+
+    pieces_by_dim = {(entry[1], entry[2]): entry for entry in all_pieces}
 
     # First, handle special combinations that maximize material usage
     placements = []
-    used_positions = []  # List of (x, y, width, length)
+
+    # Placed rectangles as one preallocated (N, 4) array of x, y, w, h
+    # columns instead of a list of tuples, so overlap confirmation below is
+    # a vectorized compare rather than per-tuple unpacking
+    total_quantity = sum(quantity for _, _, quantity in pieces)
+    used = np.empty((max(total_quantity, 1) * 2, 4), dtype=np.float64)
+    n_used = 0
+
+    # Rasterized occupancy bitmap, one byte per cm cell. Cells are marked
+    # conservatively (floor start, ceil end) so fractional dimensions can
+    # never yield a false "free" answer.
+    occ = np.zeros(
+        (int(math.ceil(roll_length)), int(math.ceil(roll_width))), dtype=np.uint8
+    )
+
+    # Free spaces are maintained incrementally: placing a piece splits only
+    # the free rectangles it intersects, instead of recomputing the whole
+    # set from every placement on each query
+    min_dimension = 0.1  # Minimum useful dimension in cm
+    free_spaces = [(0, 0, roll_width, roll_length)]
+
+    def split_free_space(space, rect):
+        # Split a free rectangle into the (up to four) parts left around an
+        # overlapping placement
+        fx, fy, fw, fh = space
+        px, py, pw, ph = rect
+        parts = []
+
+        # Rectangle to the left of the piece
+        if fx < px:
+            parts.append((fx, fy, px - fx, fh))
+
+        # Rectangle to the right of the piece
+        if fx + fw > px + pw:
+            parts.append((px + pw, fy, (fx + fw) - (px + pw), fh))
+
+        # Rectangle above the piece
+        if fy < py:
+            parts.append((fx, fy, fw, py - fy))
+
+        # Rectangle below the piece
+        if fy + fh > py + ph:
+            parts.append((fx, py + ph, fw, (fy + fh) - (py + ph)))
+
+        return parts
+
+    def update_free_spaces(rect):
+        # Split the free rectangles that intersect the placed rect, drop
+        # slivers and rectangles contained in another, keep largest first
+        px, py, pw, ph = rect
+        updated = []
+        for space in free_spaces:
+            fx, fy, fw, fh = space
+            if fx + fw <= px or px + pw <= fx or fy + fh <= py or py + ph <= fy:
+                updated.append(space)
+            else:
+                updated.extend(split_free_space(space, rect))
+
+        updated = [
+            s for s in updated if s[2] >= min_dimension and s[3] >= min_dimension
+        ]
+
+        pruned = []
+        for i, a in enumerate(updated):
+            contained = False
+            for j, b in enumerate(updated):
+                if i == j:
+                    continue
+                if (b[0] <= a[0] and b[1] <= a[1] and
+                        b[0] + b[2] >= a[0] + a[2] and b[1] + b[3] >= a[1] + a[3]):
+                    # Drop a if strictly contained, or keep only the first
+                    # copy of exact duplicates
+                    if a != b or j < i:
+                        contained = True
+                        break
+            if not contained:
+                pruned.append(a)
+
+        pruned.sort(key=lambda s: s[2] * s[3], reverse=True)
+        free_spaces[:] = pruned
+
+    # Summed-area table over the bitmap, rebuilt lazily: consecutive
+    # searches between placements (e.g. the normal and rotated probes for
+    # one piece) share the same table
+    sat_cache = None
+
+    def place_piece(x, y, w, h):
+        # Record a placement in the output list, the positions array, the
+        # occupancy bitmap and the free-space set in one step
+        nonlocal used, n_used, sat_cache
+        placements.append((x, y, w, h))
+        if n_used == len(used):
+            used = np.concatenate([used, np.empty_like(used)])
+        used[n_used] = (x, y, w, h)
+        n_used += 1
+        occ[int(y):int(math.ceil(y + h)), int(x):int(math.ceil(x + w))] = 1
+        sat_cache = None
+        update_free_spaces((x, y, w, h))
+
+    def bottom_left_search(pw, ph):
+        # Find the bottom-left-most free position for a pw x ph piece.
+        # A summed-area table over the occupancy bitmap tests every
+        # candidate position with four lookups, so the whole grid is
+        # evaluated in one vectorized pass instead of per-(x, y) probes.
+        nonlocal sat_cache
+        # floor, not int(): int() truncates toward zero, so a fractional
+        # deficit like -0.5 would slip past the guard below
+        max_x = math.floor(roll_width - pw)
+        max_y = math.floor(roll_length - ph)
+        if max_x < 0 or max_y < 0:
+            return -1, -1
+
+        rows = int(math.ceil(ph))
+        cols = int(math.ceil(pw))
+        height, width = occ.shape
+
+        if sat_cache is None:
+            sat_cache = np.zeros((height + 1, width + 1), dtype=np.int64)
+            sat_cache[1:, 1:] = occ.cumsum(axis=0).cumsum(axis=1)
+        sat = sat_cache
+
+        # Rectangle sum for every candidate origin (y, x)
+        sums = (
+            sat[rows:, cols:]
+            - sat[rows:, :width - cols + 1]
+            - sat[:height - rows + 1, cols:]
+            + sat[:height - rows + 1, :width - cols + 1]
+        )
+        candidates = np.argwhere(sums[:max_y + 1, :max_x + 1] == 0)
+        if len(candidates):
+            # argwhere is row-major, so the first hit is lowest y, then x
+            return int(candidates[0][1]), int(candidates[0][0])
+        return -1, -1
 
     # Define the special combinations we want to handle
     special_combos = [
@@ -47,305 +270,194 @@ def optimize_cutting(roll_width, roll_length, pieces, force_horizontal=False):
         [(150, 200), (150, 200), 1]
     ]
 
-    # Sort pieces by length first, then width for better vertical stacking
-    all_pieces.sort(key=lambda x: (x[2], x[1]), reverse=True)
-
-    # Function to check if a position is already occupied
-    def is_position_occupied(x, y, w, h):
-        # Check if out of bounds
-        if x < 0 or y < 0 or x + w > roll_width or y + h > roll_length:
-            return True
-
-        # Check for overlap with existing placements
-        for px, py, pw, ph in used_positions:
-            # Check if rectangles overlap
-            if not (x + w <= px or px + pw <= x or y + h <= py or py + ph <= y):
-                return True
-        return False
+    # Sort pieces by length first, then width for better vertical stacking;
+    # a seeded run jitters the primary key to explore alternative orderings
+    if rng is None:
+        all_pieces.sort(key=lambda x: (x[2], x[1]), reverse=True)
+    else:
+        all_pieces.sort(key=lambda x: (x[2] * rng.uniform(0.9, 1.1), x[1]), reverse=True)
 
     # Try to place these special combinations first
     for primary_size, secondary_size, secondary_count in special_combos:
+        # Look the piece types up by dimension instead of filtering the list
+        primary = pieces_by_dim.get(primary_size)
+        secondary = pieces_by_dim.get(secondary_size)
+        if primary is None or secondary is None:
+            continue
+
         primary_width, primary_length = primary_size
         secondary_width, secondary_length = secondary_size
 
-        # Check if we have these piece types
-        primary_pieces = [(pid, w, l, q, a) for pid, w, l, q, a in all_pieces if w == primary_width and l == primary_length]
-        secondary_pieces = [(pid, w, l, q, a) for pid, w, l, q, a in all_pieces if w == secondary_width and l == secondary_length]
-
-        if primary_pieces and secondary_pieces:
-            primary_id, _, _, primary_qty, _ = primary_pieces[0]
-            secondary_id, _, _, secondary_qty, _ = secondary_pieces[0]
-
-            # If we have enough pieces for this combo
-            while primary_qty > 0 and secondary_qty >= secondary_count:
-                # Try to find a valid placement for this combo
-                placed = False
-                for y in range(0, int(roll_length - primary_length) + 1):
-                    for x in range(0, int(roll_width - primary_width - secondary_width) + 1):
-                        # Check if we can place the entire combo
-                        if (not is_position_occupied(x, y, primary_width, primary_length) and
-                            not is_position_occupied(x + primary_width, y, secondary_width, secondary_length * secondary_count)):
-
-                            # Place the primary piece
-                            placements.append((x, y, primary_width, primary_length))
-                            used_positions.append((x, y, primary_width, primary_length))
-
-                            # Place the secondary pieces
-                            for i in range(secondary_count):
-                                placements.append((x + primary_width, y + i * secondary_length, 
-                                                 secondary_width, secondary_length))
-                                used_positions.append((x + primary_width, y + i * secondary_length, 
-                                                     secondary_width, secondary_length))
-
-                            # Update piece counts
-                            primary_qty -= 1
-                            secondary_qty -= secondary_count
-
-                            # Update the master list
-                            for i, (pid, w, l, q, a) in enumerate(all_pieces):
-                                if pid == primary_id:
-                                    all_pieces[i] = (pid, w, l, q-1, a)
-                                if pid == secondary_id:
-                                    all_pieces[i] = (pid, w, l, q-secondary_count, a)
-
-                            placed = True
-                            break
-                    if placed:
-                        break
+        # The primary and the stacked secondaries are adjacent, so one
+        # bounding-box search covers both rectangles
+        combo_width = primary_width + secondary_width
+        combo_length = max(primary_length, secondary_length * secondary_count)
 
-                # If we couldn't place this combo, move on
-                if not placed:
-                    break
+        # If we have enough pieces for this combo
+        while primary[3] > 0 and secondary[3] >= secondary_count:
+            # One vectorized pass over the bitmap finds the bottom-left
+            # free slot for the combo's bounding box
+            x, y = bottom_left_search(combo_width, combo_length)
+            if x < 0:
+                break
 
-    # Sort pieces by area in descending order for more efficient packing
-    all_pieces = [(pid, w, l, q, a) for pid, w, l, q, a in all_pieces if q > 0]
-    all_pieces.sort(key=lambda x: x[4], reverse=True)
+            # Place the primary piece
+            place_piece(x, y, primary_width, primary_length)
 
-    # Store the dimensions of free spaces
-    def find_free_spaces():
-        # Start with the entire roll
-        free_spaces = [(0, 0, roll_width, roll_length)]
+            # Place the secondary pieces
+            for i in range(secondary_count):
+                place_piece(x + primary_width, y + i * secondary_length,
+                            secondary_width, secondary_length)
 
-        # For each placed piece, update the free spaces
-        for px, py, pw, ph in used_positions:
-            new_free_spaces = []
+            # Update piece counts directly on the shared entries
+            primary[3] -= 1
+            secondary[3] -= secondary_count
 
-            for fx, fy, fw, fh in free_spaces:
-                # If no overlap, keep the space
-                if fx + fw <= px or px + pw <= fx or fy + fh <= py or py + ph <= fy:
-                    new_free_spaces.append((fx, fy, fw, fh))
-                    continue
+    # Sort pieces by area in descending order for more efficient packing
+    all_pieces = [entry for entry in all_pieces if entry[3] > 0]
+    all_pieces.sort(key=lambda x: x[4], reverse=True)
+
+    # First pass: skyline strip packing. skyline[x] holds the current top y
+    # of column x; a piece goes to the x whose covered columns have the
+    # lowest top, and placing it raises those columns, so this pass needs
+    # no overlap test at all.
+    W = int(roll_width)
+    if W > 0:
+        if n_used:
+            # Seed the skyline from the combo placements already on the roll
+            cols = occ[:, :W]
+            skyline = np.where(
+                cols.any(axis=0),
+                cols.shape[0] - np.argmax(cols[::-1, :], axis=0),
+                0
+            ).astype(np.int64)
+        else:
+            skyline = np.zeros(W, dtype=np.int64)
 
-                # Split into at most 4 new rectangles
-
-                # Rectangle to the left of the piece
-                if fx < px:
-                    left_width = px - fx
-                    new_free_spaces.append((fx, fy, left_width, fh))
-
-                # Rectangle to the right of the piece
-                if fx + fw > px + pw:
-                    right_width = (fx + fw) - (px + pw)
-                    new_free_spaces.append((px + pw, fy, right_width, fh))
-
-                # Rectangle above the piece
-                if fy < py:
-                    top_height = py - fy
-                    new_free_spaces.append((fx, fy, fw, top_height))
-
-                # Rectangle below the piece
-                if fy + fh > py + ph:
-                    bottom_height = (fy + fh) - (py + ph)
-                    new_free_spaces.append((fx, py + ph, fw, bottom_height))
-
-            free_spaces = new_free_spaces
-
-        # Filter out tiny spaces and merge overlapping ones
-        min_dimension = 0.1  # Minimum useful dimension in cm
-        filtered_spaces = []
-        for x, y, w, h in free_spaces:
-            if w >= min_dimension and h >= min_dimension:
-                filtered_spaces.append((x, y, w, h))
-
-        # Sort by area (largest first)
-        filtered_spaces.sort(key=lambda s: s[2] * s[3], reverse=True)
-        return filtered_spaces
-
-    # First pass: Strip packing - fill each strip across the width
-    current_height = 0
-    while current_height < roll_length:
-        # Find height of the current strip
-        strip_placed = False
-        strip_height = 0
-
-        # Try to place pieces in strips across the width
-        for piece_id, piece_width, piece_length, quantity, area in all_pieces:
-            if quantity <= 0:
+        for entry in all_pieces:
+            piece_id, piece_width, piece_length, quantity, area = entry
+            piece_cols = int(math.ceil(piece_width))
+            if quantity <= 0 or piece_cols > W:
                 continue
 
-            current_width = 0
-            while quantity > 0 and current_width + piece_width <= roll_width:
-                # Try to place the piece without rotation
-                if not is_position_occupied(current_width, current_height, piece_width, piece_length):
-                    placements.append((current_width, current_height, piece_width, piece_length))
-                    used_positions.append((current_width, current_height, piece_width, piece_length))
-
-                    # Update strip height
-                    strip_height = max(strip_height, piece_length)
-                    strip_placed = True
-
-                    # Update position and quantity
-                    current_width += piece_width
-                    quantity -= 1
-
-                    # Update the piece count in all_pieces
-                    for i, (pid, w, l, q, a) in enumerate(all_pieces):
-                        if pid == piece_id:
-                            all_pieces[i] = (pid, w, l, q-1, a)
-                            break
-                else:
-                    # Try with increments
-                    current_width += 1
+            while quantity > 0:
+                # Skyline top under every candidate x, as one windowed max
+                tops = np.lib.stride_tricks.sliding_window_view(
+                    skyline, piece_cols
+                ).max(axis=1)
+                best_x = int(np.argmin(tops))
+                top_y = int(tops[best_x])
+                if top_y + piece_length > roll_length:
+                    break
 
-        if strip_placed:
-            current_height += strip_height
-        else:
-            # No pieces placed in this strip, try a different approach
-            break
+                place_piece(best_x, top_y, piece_width, piece_length)
+                skyline[best_x:best_x + piece_cols] = top_y + int(math.ceil(piece_length))
+                quantity -= 1
+
+            entry[3] = quantity
 
     # Second pass: Maximal rectangles - fill remaining spaces efficiently
-    remaining_pieces = [(pid, w, l, q, a) for pid, w, l, q, a in all_pieces if q > 0]
+    remaining_pieces = [entry for entry in all_pieces if entry[3] > 0]
 
     # Sort by area (largest first)
     remaining_pieces.sort(key=lambda x: x[4], reverse=True)
 
     # For each piece, try to find a free space that fits
     for piece_id, piece_width, piece_length, quantity, area in remaining_pieces:
+        # Once no free space remains and the bitmap is full, neither the
+        # space scan nor the bottom-left fallback can place anything
+        if not free_spaces and occ.all():
+            break
+
         for _ in range(quantity):
-            # Find all free spaces
-            free_spaces = find_free_spaces()
             placed = False
 
-            for space_x, space_y, space_width, space_height in free_spaces:
-                # Try without rotation
+            # The free-space list is sorted by area, so one O(1) check on
+            # its head rules out a futile scan
+            if free_spaces and free_spaces[0][2] * free_spaces[0][3] < area:
+                spaces_to_scan = ()
+            else:
+                spaces_to_scan = free_spaces
+
+            # Best-Short-Side-Fit: score every feasible space/orientation by
+            # the smaller leftover side and place in the tightest one, which
+            # packs better than first-fit and keeps pieces out of the more
+            # expensive bottom-left fallback
+            best_score = None
+            best_space = None
+            best_rotated = False
+            for space_x, space_y, space_width, space_height in spaces_to_scan:
                 if piece_width <= space_width and piece_length <= space_height:
-                    placements.append((space_x, space_y, piece_width, piece_length))
-                    used_positions.append((space_x, space_y, piece_width, piece_length))
-                    placed = True
-                    break
+                    score = min(space_width - piece_width, space_height - piece_length)
+                    if best_score is None or score < best_score:
+                        best_score = score
+                        best_space = (space_x, space_y)
+                        best_rotated = False
 
-                # Tentar rotação considerando o melhor aproveitamento do espaço
                 if piece_length <= space_width and piece_width <= space_height:
-                    # Calcular o espaço restante em ambas as orientações
-                    waste_normal = (space_width * space_height) - (piece_width * piece_length)
-                    waste_rotated = (space_width * space_height) - (piece_length * piece_width)
-
-                    # Escolher a orientação que minimiza o desperdício
-                    if waste_rotated < waste_normal:
-                        placements.append((space_x, space_y, piece_length, piece_width))
-                        used_positions.append((space_x, space_y, piece_length, piece_width))
-                    else:
-                        placements.append((space_x, space_y, piece_width, piece_length))
-                        used_positions.append((space_x, space_y, piece_width, piece_length))
-                    placed = True
-                    break
+                    score = min(space_width - piece_length, space_height - piece_width)
+                    if best_score is None or score < best_score:
+                        best_score = score
+                        best_space = (space_x, space_y)
+                        best_rotated = True
+
+            if best_space is not None:
+                if best_rotated:
+                    place_piece(best_space[0], best_space[1], piece_length, piece_width)
+                else:
+                    place_piece(best_space[0], best_space[1], piece_width, piece_length)
+                placed = True
 
             # If we couldn't place the piece in any free space, try bottom-left packing
             if not placed:
-                best_x, best_y = float('inf'), float('inf')
+                # Try without rotation, then keep the rotated position only
+                # if it is strictly lower/lefter
+                best_x, best_y = bottom_left_search(piece_width, piece_length)
                 best_rotated = False
 
-                # Try without rotation
-                for y in range(0, int(roll_length - piece_length) + 1):
-                    for x in range(0, int(roll_width - piece_width) + 1):
-                        if not is_position_occupied(x, y, piece_width, piece_length):
-                            if y < best_y or (y == best_y and x < best_x):
-                                best_x, best_y = x, y
-                                best_rotated = False
-                                break
-                    if best_x != float('inf'):
-                        break
-
-                # Try with rotation
-                for y in range(0, int(roll_length - piece_width) + 1):
-                    for x in range(0, int(roll_width - piece_length) + 1):
-                        if not is_position_occupied(x, y, piece_length, piece_width):
-                            if y < best_y or (y == best_y and x < best_x):
-                                best_x, best_y = x, y
-                                best_rotated = True
-                                break
-                    if best_x != float('inf'):
-                        break
+                rot_x, rot_y = bottom_left_search(piece_length, piece_width)
+                if rot_x >= 0 and (
+                    best_x < 0 or rot_y < best_y or (rot_y == best_y and rot_x < best_x)
+                ):
+                    best_x, best_y = rot_x, rot_y
+                    best_rotated = True
 
                 # If a valid position was found, place the piece
-                if best_x != float('inf'):
+                if best_x >= 0:
                     if best_rotated:
-                        placements.append((best_x, best_y, piece_length, piece_width))
-                        used_positions.append((best_x, best_y, piece_length, piece_width))
+                        place_piece(best_x, best_y, piece_length, piece_width)
                     else:
-                        placements.append((best_x, best_y, piece_width, piece_length))
-                        used_positions.append((best_x, best_y, piece_width, piece_length))
-
-    # Verificar consistência: Não queremos mais peças do que o especificado
-    # Vamos verificar se não excedemos as quantidades de peças originais
-
-    # Contabilizar quantas peças colocamos de cada tipo
-    pieces_placed = defaultdict(int)
-    for x, y, w, l in placements:
-        pieces_placed[(w, l)] += 1
-
-    # Verificar se excedemos a quantidade original de peças
-    original_pieces = {}
-    for width, length in pieces:
-        key = (width, length)
-        if key in original_pieces:
-            original_pieces[key] += 1
-        else:
-            original_pieces[key] = 1
-
-    # Remover peças excedentes
-    excess_placements = []
-    for (w, l), count in pieces_placed.items():
-        original_count = original_pieces.get((w, l), 0)
-        if count > original_count:
-            # Quantas peças excedentes temos
-            excess = count - original_count
-            excess_indices = []
-
-            # Encontrar índices das peças excedentes
-            for i, (x, y, width, length) in enumerate(placements):
-                if width == w and length == l:
-                    excess_indices.append(i)
-
-            # Remover as peças excedentes (da parte final da lista)
-            excess_indices = excess_indices[-excess:]
-
-            for i in sorted(excess_indices, reverse=True):
-                excess_placements.append(placements[i])
-                del placements[i]
-
-    # Verificar se ainda temos mais peças do tipo secundário do que deveríamos
-    for (w, l), count in pieces_placed.items():
-        # Recalcular a contagem após remoções
-        current_count = sum(1 for x, y, width, length in placements if width == w and length == l)
-        original_count = original_pieces.get((w, l), 0)
-
-        if current_count > original_count:
-            excess = current_count - original_count
-            for _ in range(excess):
-                for i, (x, y, width, length) in enumerate(placements):
-                    if width == w and length == l:
-                        del placements[i]
-                        break
+                        place_piece(best_x, best_y, piece_width, piece_length)
+
+    # Verificar consistência: Não queremos mais peças do que o especificado.
+    # Uma única passada com contadores por tipo substitui as varreduras
+    # quadráticas com del: cada colocação consome do saldo do seu tipo (em
+    # qualquer orientação) e as que excedem a quantidade são descartadas.
+    # A mesma passada acumula a área utilizada, então a lista final não
+    # precisa de nenhuma varredura adicional.
+    remaining_per_key = Counter()
+    for width, length, quantity in pieces:
+        remaining_per_key[(width, length)] += quantity
+
+    kept = []
+    used_area = 0.0
+    for placement in placements:
+        key = (placement[2], placement[3])
+        if remaining_per_key[key] <= 0:
+            key = (placement[3], placement[2])
+        if remaining_per_key[key] > 0:
+            remaining_per_key[key] -= 1
+            kept.append(placement)
+            used_area += placement[2] * placement[3]
+    placements = kept
 
     # Calculate waste percentage
     total_area = roll_width * roll_length
-    used_area = sum(p[2] * p[3] for p in placements)
     waste_percentage = (total_area - used_area) / total_area * 100
 
     return placements, waste_percentage
 
-def optimize_horizontal_cutting(roll_width, roll_length, pieces):
+def optimize_horizontal_cutting(roll_width, roll_length, pieces, seed=None):
     """
     Optimize cutting with pieces placed horizontally across the roll.
     Pieces can be rotated but not resized.
@@ -353,23 +465,61 @@ def optimize_horizontal_cutting(roll_width, roll_length, pieces):
     Args:
         roll_width (float): Width of the roll in cm
         roll_length (float): Length of the roll in cm
-        pieces (list): List of tuples (width, length) for each piece in cm
+        pieces (list): List of tuples (width, length) or (width, length, quantity)
+            for each piece type in cm
+        seed (int): Optional seed that perturbs the placement order; None or 0
+            keeps the deterministic ordering
 
     Returns:
         tuple: (placements, waste_percentage)
     """
-    # Create a copy of pieces
-    pieces_copy = [(w, l) for w, l in pieces]
-
-    # Sort pieces by area (largest first) to prioritize larger pieces
-    pieces_copy.sort(key=lambda x: x[0] * x[1], reverse=True)
+    # Normalize to (width, length, quantity) so identical pieces are handled
+    # by count instead of as replicated tuples
+    pieces_copy = _normalize_pieces(pieces)
+
+    # Sort piece types by area (largest first) to prioritize larger pieces;
+    # a seeded run jitters the key to explore alternative orderings
+    rng = random.Random(seed) if seed else None
+    if rng is None:
+        pieces_copy.sort(key=lambda x: x[0] * x[1], reverse=True)
+    else:
+        pieces_copy.sort(key=lambda x: x[0] * x[1] * rng.uniform(0.9, 1.1), reverse=True)
 
     # Initialize placements and current y position
     placements = []
     current_y = 0
 
-    # Keep track of used positions
-    used_positions = []
+    # Placed rectangles as a preallocated (N, 4) array of x, y, w, h columns,
+    # as in optimize_cutting
+    total_quantity = sum(quantity for _, _, quantity in pieces_copy)
+    used = np.empty((max(total_quantity, 1), 4), dtype=np.float64)
+    n_used = 0
+
+    # Rasterized occupancy bitmap, marked conservatively as in optimize_cutting
+    occ = np.zeros(
+        (int(math.ceil(roll_length)), int(math.ceil(roll_width))), dtype=np.uint8
+    )
+
+    # Candidate positions: the "staircase" of corner points — the origin
+    # plus the right and top edges of placed rectangles. A bottom-left
+    # placement always sits on one of these, so probing them first turns
+    # most full-grid scans into O(N) probes.
+    corner_points = {(0, 0)}
+
+    # Lazily rebuilt summed-area table, shared by searches between
+    # placements as in optimize_cutting
+    sat_cache = None
+
+    def place_piece(x, y, w, h):
+        nonlocal n_used, sat_cache
+        placements.append((x, y, w, h))
+        used[n_used] = (x, y, w, h)
+        n_used += 1
+        occ[int(y):int(math.ceil(y + h)), int(x):int(math.ceil(x + w))] = 1
+        sat_cache = None
+        corner_points.discard((x, y))
+        corner_points.add((x + w, y))
+        corner_points.add((x, y + h))
 
     # Function to check if a position is already occupied
     def is_position_occupied(x, y, w, h):
@@ -377,45 +527,88 @@ def optimize_horizontal_cutting(roll_width, roll_length, pieces):
         if x < 0 or y < 0 or x + w > roll_width or y + h > roll_length:
             return True
 
-        # Check for overlap with existing placements
-        for px, py, pw, ph in used_positions:
-            # Check if rectangles overlap
-            if not (x + w <= px or px + pw <= x or y + h <= py or py + ph <= y):
-                return True
-        return False
-
-    # Process each piece
-    for width, length in pieces_copy:
-        # Try to place the piece in its original orientation
-        placed = False
-
-        # Try original orientation (horizontal)
-        if width <= roll_width:
-            for y in range(0, int(roll_length - length) + 1):
-                for x in range(0, int(roll_width - width) + 1):
-                    if not is_position_occupied(x, y, width, length):
-                        placements.append((x, y, width, length))
-                        used_positions.append((x, y, width, length))
-                        placed = True
-                        break
-                if placed:
-                    break
+        if not occ[int(y):int(math.ceil(y + h)), int(x):int(math.ceil(x + w))].any():
+            return False
+
+        # Conservative bitmap hit: confirm with the exact vectorized overlap
+        # test over the positions array
+        u = used[:n_used]
+        return bool((
+            ~((x + w <= u[:, 0]) | (u[:, 0] + u[:, 2] <= x) |
+              (y + h <= u[:, 1]) | (u[:, 1] + u[:, 3] <= y))
+        ).any())
+
+    def bottom_left_search(pw, ph):
+        # Summed-area-table scan over the bitmap, as in optimize_cutting:
+        # every candidate origin is tested with four lookups in one
+        # vectorized pass instead of per-(x, y) probes
+        nonlocal sat_cache
+        # floor, not int(): int() truncates toward zero and would let a
+        # fractional deficit pass the guard below
+        max_x = math.floor(roll_width - pw)
+        max_y = math.floor(roll_length - ph)
+        if max_x < 0 or max_y < 0:
+            return -1, -1
+
+        rows = int(math.ceil(ph))
+        cols = int(math.ceil(pw))
+        height, width = occ.shape
+
+        if sat_cache is None:
+            sat_cache = np.zeros((height + 1, width + 1), dtype=np.int64)
+            sat_cache[1:, 1:] = occ.cumsum(axis=0).cumsum(axis=1)
+        sat = sat_cache
+
+        sums = (
+            sat[rows:, cols:]
+            - sat[rows:, :width - cols + 1]
+            - sat[:height - rows + 1, cols:]
+            + sat[:height - rows + 1, :width - cols + 1]
+        )
+        candidates = np.argwhere(sums[:max_y + 1, :max_x + 1] == 0)
+        if len(candidates):
+            # argwhere is row-major, so the first hit is lowest y, then x
+            return int(candidates[0][1]), int(candidates[0][0])
+        return -1, -1
+
+    def find_position(w, h):
+        # Probe the corner staircase in bottom-left order first, then let
+        # the vectorized scan cover positions off the staircase
+        for cx, cy in sorted(corner_points, key=lambda p: (p[1], p[0])):
+            if not is_position_occupied(cx, cy, w, h):
+                return cx, cy
+        x, y = bottom_left_search(w, h)
+        if x >= 0:
+            return x, y
+        return None
+
+    # Process each piece type, iterating its quantity internally; the
+    # roll-fit tests are hoisted out of the per-unit loop
+    for width, length, quantity in pieces_copy:
+        fits_normal = width <= roll_width
+        fits_rotated = length <= roll_width
 
-        # If not placed, try rotated orientation (still horizontal)
-        if not placed and length <= roll_width:
-            for y in range(0, int(roll_length - width) + 1):
-                for x in range(0, int(roll_width - length) + 1):
-                    if not is_position_occupied(x, y, length, width):
-                        placements.append((x, y, length, width))
-                        used_positions.append((x, y, length, width))
-                        placed = True
-                        break
-                if placed:
-                    break
+        for _ in range(quantity):
+            # Try to place the piece in its original orientation
+            placed = False
 
-    # Calculate waste percentage
+            # Try original orientation (horizontal)
+            if fits_normal:
+                position = find_position(width, length)
+                if position is not None:
+                    place_piece(position[0], position[1], width, length)
+                    placed = True
+
+            # If not placed, try rotated orientation (still horizontal)
+            if not placed and fits_rotated:
+                position = find_position(length, width)
+                if position is not None:
+                    place_piece(position[0], position[1], length, width)
+
+    # Calculate waste percentage with the same vectorized reduce as
+    # optimize_cutting; the positions array already holds every placement
     total_area = roll_width * roll_length
-    used_area = sum(p[2] * p[3] for p in placements)
+    used_area = float((used[:n_used, 2] * used[:n_used, 3]).sum())
     waste_percentage = (total_area - used_area) / total_area * 100
 
     return placements, waste_percentage
@@ -454,7 +647,11 @@ def find_width_combination(pieces, target_width, tolerance=0.001):
 def find_subset_sum(pieces, target_sum, tolerance=0.001):
     """
     Find a subset of pieces whose widths sum to the target.
-    Uses a greedy approach for efficiency.
+    Uses a bitset subset-sum DP, so exact combinations are found rather
+    than only greedy prefixes.
+
+    Results are deterministic for a given input, so they are memoized and
+    repeated calls with the same pieces and target return in O(1).
 
     Args:
         pieces (list): List of (width, length) tuples
@@ -464,22 +661,45 @@ def find_subset_sum(pieces, target_sum, tolerance=0.001):
     Returns:
         list: List of (width, length) pieces that sum to target, or empty list if no solution
     """
-    # Sort pieces by width (largest first)
-    sorted_pieces = sorted(pieces, key=lambda x: x[0], reverse=True)
-
-    # Try to find exact combinations
-    current_sum = 0
-    current_pieces = []
-
-    for piece in sorted_pieces:
-        width, _ = piece
-        if current_sum + width <= target_sum + tolerance:
-            current_pieces.append(piece)
-            current_sum += width
-
-            # Check if we've reached the target
-            if abs(current_sum - target_sum) <= tolerance:
-                return current_pieces
-
-    # If we get here, no exact solution was found
-    return []
\ No newline at end of file
+    return list(_find_subset_sum_cached(tuple(pieces), target_sum, tolerance))
+
+@lru_cache(maxsize=4096)
+def _find_subset_sum_cached(pieces, target_sum, tolerance):
+    # Hashable-argument core of find_subset_sum; returns a tuple so cached
+    # results stay immutable across callers.
+    #
+    # Classic subset-sum bitset DP: the set of reachable sums is packed
+    # into one Python int, so considering a piece is a single wide
+    # shift-or instead of a per-sum loop, and exact combinations a greedy
+    # prefix scan would miss (e.g. 50 + 50 = 100 when a 60 is present)
+    # are found. Widths are quantized to the tolerance grid.
+    scale = max(int(round(1 / tolerance)), 1) if tolerance > 0 else 1000
+    target = int(round(target_sum * scale))
+    if target <= 0:
+        return ()
+
+    widths = [int(round(width * scale)) for width, _ in pieces]
+
+    # Keep the per-piece prefix bitsets for witness reconstruction
+    mask = (1 << (target + 1)) - 1
+    reachable = [1]
+    for width_int in widths:
+        bits = reachable[-1]
+        if 0 < width_int <= target:
+            bits = (bits | (bits << width_int)) & mask
+        reachable.append(bits)
+
+    if not (reachable[-1] >> target) & 1:
+        return ()
+
+    # Walk the pieces backwards: a piece is in the subset exactly when the
+    # remainder is not reachable without it
+    chosen = []
+    remaining = target
+    for i in range(len(pieces) - 1, -1, -1):
+        if (reachable[i] >> remaining) & 1:
+            continue
+        chosen.append(pieces[i])
+        remaining -= widths[i]
+
+    return tuple(reversed(chosen))
\ No newline at end of file
@@ -1,9 +1,39 @@
-import matplotlib.pyplot as plt
-import matplotlib.patches as patches
 import numpy as np
-from collections import defaultdict
+from functools import lru_cache
 
-def visualize_cutting_pattern(roll_width, roll_length, placements, unit):
+# matplotlib is imported lazily inside the drawing functions: importing it
+# costs hundreds of milliseconds, which optimizer-only code paths that
+# merely import this module should not pay
+
+# Pieces whose smallest dimension falls below this cutoff would render an
+# unreadable label anyway, so no label is drawn for them at all
+SMALL_LABEL_CUTOFF = 15
+
+# Legend entry template, bound once at import; calling a precompiled
+# str.format is cheaper than rebuilding the f-string per entry when many
+# layouts are rendered in a row
+_LEGEND_FMT = "{w:.3f}×{l:.3f} {u} ({n}x)".format
+
+# Shared background-box properties for large labels, bound once instead
+# of rebuilding the dict literal per label
+_LABEL_BBOX = dict(facecolor='white', alpha=0.7, edgecolor='none', pad=1)
+
+@lru_cache(maxsize=1)
+def _label_effects():
+    # Shared stroke effect that keeps labels readable on colored pieces
+    # without instantiating a bbox patch per label
+    from matplotlib.patheffects import withStroke
+    return [withStroke(linewidth=2, foreground='white')]
+
+@lru_cache(maxsize=1)
+def _tab20():
+    # Colormap for the pieces, resolved once on first draw: an ndarray can
+    # be fancy-indexed by group id to build the face-color array in one
+    # shot instead of going through the colormap registry per call
+    import matplotlib.pyplot as plt
+    return np.asarray(plt.cm.tab20.colors, dtype=np.float32)
+
+def visualize_cutting_pattern(roll_width, roll_length, placements, unit, fig=None):
     """
     Visualize the cutting pattern on the roll.
 
@@ -12,10 +42,46 @@ def visualize_cutting_pattern(roll_width, roll_length, placements, unit):
         roll_length (float): Length of the roll in cm
         placements (list): List of tuples (x, y, width, length) for each piece
         unit (str): Unit of measurement (meters or centimeters)
+        fig (matplotlib.figure.Figure): Optional figure from a previous call
+            to redraw in place; the axes, roll outline, grid, and margins
+            are kept and only the pieces, labels, legend, and info box are
+            rebuilt
 
     Returns:
         matplotlib.figure.Figure: Figure object with the visualization
     """
+    if fig is not None:
+        # Reuse path: strip only the dynamic artists and redraw them on
+        # the existing axes, keeping the shared setup work. The figure may
+        # be one the memo below handed out, and mutating it in place would
+        # leave the cache returning a figure that no longer matches its
+        # key, so drop the memo before touching it.
+        _visualize_cached.cache_clear()
+        ax = fig.axes[0]
+        for collection in list(ax.collections):
+            if collection.get_gid() == 'pieces':
+                collection.remove()
+        for text in list(ax.texts):
+            text.remove()
+        legend = ax.get_legend()
+        if legend is not None:
+            legend.remove()
+        _draw_dynamic(ax, roll_width, roll_length, tuple(map(tuple, placements)), unit)
+        return fig
+
+    # The figure is a pure function of the inputs, so identical re-renders
+    # (scrolling back to a result, re-running with the same pieces) come
+    # from the memo instead of a full rebuild
+    return _visualize_cached(
+        roll_width, roll_length, tuple(map(tuple, placements)), unit
+    )
+
+@lru_cache(maxsize=32)
+def _visualize_cached(roll_width, roll_length, placements, unit):
+    import matplotlib.patches as patches
+    from matplotlib.figure import Figure
+
+    # Hashable-argument core of visualize_cutting_pattern
     # Create figure and axis with inverted axes (width on y-axis, length on x-axis)
     # Swap width and height for the figure size
     aspect_ratio = roll_length / roll_width  # Aspect ratio for inverted axes
@@ -23,18 +89,19 @@ def visualize_cutting_pattern(roll_width, roll_length, placements, unit):
     fig_width = 10
     fig_height = min(fig_width * aspect_ratio, 6)  # Ensure height is appropriate
 
-    # Create figure in landscape orientation
-    fig, ax = plt.subplots(figsize=(fig_width, fig_height))
+    # Create figure in landscape orientation, without going through
+    # pyplot: figures in the pyplot registry are kept alive until
+    # plt.close, so repeated renders would accumulate there and never be
+    # garbage collected once the caller drops them
+    fig = Figure(figsize=(fig_width, fig_height))
+    ax = fig.add_subplot(111)
 
-    # Set limits and labels with inverted axes
-    ax.set_xlim(0, roll_length)  # X-axis now represents length
-    ax.set_ylim(roll_width, 0)   # Y-axis now represents width (inverted for coordinate system)
+    # The limits are set explicitly, so turn autoscaling off up front:
+    # with it on, every add_patch/add_collection call recomputes the
+    # data limits over the new artist
+    ax.set_autoscale_on(False)
 
-    # Convert units for display
-    conversion = 100 if unit == "meters" else 1
-
-    # Add title and labels with inverted axes
-    ax.set_title(f"Cutting Pattern - Roll: {roll_width/conversion:.3f}×{roll_length/conversion:.3f} {unit}")
+    # Set axis labels with inverted axes
     ax.set_xlabel(f"Length ({unit})")  # Now x-axis is length
     ax.set_ylabel(f"Width ({unit})")   # Now y-axis is width
 
@@ -45,79 +112,145 @@ def visualize_cutting_pattern(roll_width, roll_length, placements, unit):
     )
     ax.add_patch(roll)
 
-    # Define a colormap for the pieces
-    colors = plt.cm.tab20.colors
-
-    # Group identical pieces
-    piece_groups = defaultdict(list)
-    for i, (x, y, width, length) in enumerate(placements):
-        piece_groups[(width, length)].append((i, x, y))
-
-    # Draw pieces with grouped colors and labels
-    color_idx = 0
-    for (width, length), positions in piece_groups.items():
-        color = colors[color_idx % len(colors)]
-        color_idx += 1
-
-        # Draw each piece in this group - with inverted axes
-        for i, x, y in positions:
-            # For inverted axes, we draw the rectangle with (y, x) coordinates
-            # and (length, width) dimensions
-            piece = patches.Rectangle(
-                (y, x), length, width,  # Inverted: (y, x, length, width)
-                linewidth=1, edgecolor='black', facecolor=color, alpha=0.7
-            )
-            ax.add_patch(piece)
-
-            # Add text label in the center of the piece with size proportional to piece
-            # Calculate better font size based on the piece dimensions
-            piece_area = width * length
-            min_dimension = min(width, length)
-
-            # Adjust font size dynamically based on piece dimensions
-            if min_dimension < 20:  # Very small pieces
-                font_size = 5
-            else:
-                # Make font size proportional to the smallest dimension of the piece
-                font_size = min(max(6, min_dimension / 25), 10)
-
-            # Create label text - short format for small pieces
-            if min_dimension < 30:
-                # Compact format for small pieces
-                label_text = f"{i+1}"
-            elif min_dimension < 60:
-                # Medium size pieces with slightly more info
-                label_text = f"{i+1}"
-            else:
-                # Normal format with dimensions for larger pieces
-                label_text = f"{i+1}\n{width/conversion:.2f}×{length/conversion:.2f}"
-
-            # Center position is also inverted: (y+length/2, x+width/2)
-            ax.text(
-                y + length/2, x + width/2,  # Inverted text position
-                label_text,
-                horizontalalignment='center',
-                verticalalignment='center',
-                fontsize=font_size,
-                fontweight='bold',
-                bbox=dict(facecolor='white', alpha=0.7, edgecolor='none', pad=1)
-            )
-
     # Add grid
     ax.grid(True, linestyle='--', alpha=0.5)
 
-    # Add legend showing each unique piece size with counts
-    legend_entries = []
-    for (width, length), positions in piece_groups.items():
-        count = len(positions)
-        legend_entries.append(
-            f"{width/conversion:.3f}×{length/conversion:.3f} {unit} ({count}x)"
+    # Fixed margins with extra space for the legend: tight_layout runs a
+    # full layout solve over every artist, which gets slow on figures
+    # with many labels, and the margins here are static anyway
+    fig.subplots_adjust(left=0.08, right=0.98, top=0.92, bottom=0.22)
+
+    _draw_dynamic(ax, roll_width, roll_length, placements, unit)
+
+    return fig
+
+def _draw_dynamic(ax, roll_width, roll_length, placements, unit):
+    import matplotlib.patches as patches
+    from matplotlib.collections import PolyCollection
+
+    # Placement-dependent artists: pieces, labels, legend, and info box.
+    # Shared by the fresh-figure path and the figure-reuse path.
+    tab20 = _tab20()
+    # Set limits with inverted axes
+    ax.set_xlim(0, roll_length)  # X-axis now represents length
+    ax.set_ylim(roll_width, 0)   # Y-axis now represents width (inverted for coordinate system)
+
+    # Convert units for display
+    conversion = 100 if unit == "meters" else 1
+
+    # Add title with inverted axes
+    ax.set_title(f"Cutting Pattern - Roll: {roll_width/conversion:.3f}×{roll_length/conversion:.3f} {unit}")
+
+    # Group identical pieces in one vectorized call: the unique sizes,
+    # the group id of every placement, and the per-size counts all come
+    # from np.unique instead of a Python dict loop. float32 is plenty for
+    # drawing coordinates and halves the memory traffic of the vertex and
+    # grouping work on large layouts.
+    arr = np.asarray(placements, dtype=np.float32).reshape(-1, 4)
+    unique_dims, inverse, counts = np.unique(
+        arr[:, 2:4], axis=0, return_inverse=True, return_counts=True
+    )
+
+    # Legend handles are purely visual color swatches, one per unique
+    # size; their colors come from the same fancy-indexed colormap slice
+    # as the piece faces
+    legend_handles = [
+        patches.Patch(color=color)
+        for color in tab20[np.arange(len(unique_dims)) % len(tab20)]
+    ]
+
+    # One vectorized draw call for all rectangles, colored by group id;
+    # the data limits are set once instead of being recomputed per patch.
+    # For inverted axes, the rectangle origin is (y, x) and its extents
+    # are (length, width).
+    if len(arr):
+        x0, y0 = arr[:, 0], arr[:, 1]
+        x1, y1 = x0 + arr[:, 2], y0 + arr[:, 3]
+
+        # Write the corners straight into one preallocated buffer; the
+        # nested np.stack calls built five temporary arrays per call
+        verts = np.empty((len(arr), 4, 2), dtype=np.float32)
+        verts[:, 0, 0] = y0
+        verts[:, 0, 1] = x0
+        verts[:, 1, 0] = y1
+        verts[:, 1, 1] = x0
+        verts[:, 2, 0] = y1
+        verts[:, 2, 1] = x1
+        verts[:, 3, 0] = y0
+        verts[:, 3, 1] = x1
+        collection = PolyCollection(
+            verts, facecolors=tab20[inverse % len(tab20)],
+            edgecolors='black', linewidths=1, alpha=0.7
+        )
+        collection.set_gid('pieces')
+
+        # Axis-aligned rectangles gain nothing from antialiasing, and
+        # snapping to the pixel grid lets the raster backend blit them;
+        # very large layouts are flattened to one raster layer so vector
+        # exports don't carry thousands of path elements
+        collection.set_snap(True)
+        collection.set_antialiased(False)
+        if len(arr) > 1000:
+            collection.set_rasterized(True)
+
+        ax.add_collection(collection, autolim=False)
+    ax.update_datalim([[0, 0], [roll_length, roll_width]])
+
+    # Add text labels in the center of each piece with size proportional
+    # to the piece. Font sizes and format selection are precomputed over
+    # the dimension columns, so the loop branches on ready-made arrays and
+    # only renders the dimension format where it is actually shown:
+    # very small pieces get 5pt, others scale with their smallest
+    # dimension clamped to 6-10pt, and pieces under 60 use the compact
+    # number-only label.
+    if len(arr):
+        min_dims = np.minimum(arr[:, 2], arr[:, 3])
+        font_sizes = np.where(
+            min_dims < 20, 5.0, np.clip(min_dims / 25.0, 6.0, 10.0)
         )
+        compact = min_dims < 60
+
+        # Pieces below the cutoff are too small to label legibly
+        visible = min_dims >= SMALL_LABEL_CUTOFF
+
+        # Emit the labels in font-size buckets so every label in a bucket
+        # shares one prebuilt style dict instead of re-parsing the same
+        # keyword arguments per call. Large labels get the shared
+        # background box for contrast; a box doubles the artists per
+        # label, so small labels use the one-artist stroke effect instead.
+        label_style = dict(
+            horizontalalignment='center',
+            verticalalignment='center',
+            fontweight='bold',
+        )
+        for size in np.unique(font_sizes[visible]):
+            bucket_style = dict(fontsize=size, **label_style)
+            if size >= 8:
+                bucket_style['bbox'] = _LABEL_BBOX
+            else:
+                bucket_style['path_effects'] = _label_effects()
+            for i in np.nonzero(visible & (font_sizes == size))[0]:
+                x, y, width, length = placements[i]
+                if compact[i]:
+                    label_text = f"{i+1}"
+                else:
+                    # Normal format with dimensions for larger pieces
+                    label_text = f"{i+1}\n{width/conversion:.2f}×{length/conversion:.2f}"
+
+                # Center position is also inverted: (y+length/2, x+width/2)
+                ax.text(y + length/2, x + width/2, label_text, **bucket_style)
+
+    # Add legend showing each unique piece size with counts, built from
+    # the unique-size table rather than a second pass over the pieces
+    legend_entries = [
+        _LEGEND_FMT(w=width / conversion, l=length / conversion, u=unit, n=count)
+        for (width, length), count in zip(unique_dims, counts)
+    ]
 
     # Place the legend outside the plot area
     if legend_entries:
         leg = ax.legend(
-            handles=[patches.Patch(color=colors[i % len(colors)]) for i in range(len(legend_entries))],
+            handles=legend_handles,
             labels=legend_entries,
             title="Piece Dimensions (Quantity)",
             loc='upper center', 
@@ -128,9 +261,10 @@ def visualize_cutting_pattern(roll_width, roll_length, placements, unit):
             shadow=True
         )
 
-    # Add utilization information
+    # Add utilization information; the placement array is already built,
+    # so the area sum is one vectorized multiply-reduce
     total_area = roll_width * roll_length
-    used_area = sum(p[2] * p[3] for p in placements)
+    used_area = float((arr[:, 2] * arr[:, 3]).sum())
     utilization = used_area / total_area * 100
     waste_area = total_area - used_area
 
@@ -148,8 +282,91 @@ def visualize_cutting_pattern(roll_width, roll_length, placements, unit):
         bbox=dict(boxstyle="round,pad=0.3", fc="white", ec="black", alpha=0.9)
     )
 
-    # Make layout tight but with extra space for the legend
-    plt.tight_layout()
-    plt.subplots_adjust(bottom=0.2)
+def visualize_cutting_pattern_plotly(roll_width, roll_length, placements, unit):
+    """
+    Visualize the cutting pattern as an interactive Plotly figure.
+
+    All rectangles of one piece type are drawn as a single filled scatter
+    trace (sub-polygons separated by None), so trace count scales with the
+    number of unique sizes rather than the number of pieces, and pan/zoom
+    happen client-side without a server round trip.
+
+    Args:
+        roll_width (float): Width of the roll in cm
+        roll_length (float): Length of the roll in cm
+        placements (list): List of tuples (x, y, width, length) for each piece
+        unit (str): Unit of measurement (meters or centimeters)
+
+    Returns:
+        plotly.graph_objects.Figure: Interactive figure with the visualization
+    """
+    import plotly.graph_objects as go
+    from plotly.colors import qualitative
+
+    conversion = 100 if unit == "meters" else 1
+    palette = qualitative.Light24
+
+    fig = go.Figure()
+
+    # Group identical pieces by lexsorting the dimension columns and
+    # splitting contiguous runs: no float hashing, and every group is a
+    # contiguous slice, so the polygon arrays below are built with
+    # sequential vectorized column stacking instead of per-piece appends
+    arr = np.asarray(placements, dtype=np.float64).reshape(-1, 4)
+    sorted_arr = arr[np.lexsort((arr[:, 3], arr[:, 2]))]
+    if len(sorted_arr):
+        change = np.any(np.diff(sorted_arr[:, 2:4], axis=0) != 0, axis=1)
+        group_starts = np.concatenate(
+            ([0], np.flatnonzero(change) + 1, [len(sorted_arr)])
+        )
+    else:
+        group_starts = np.array([0])
+
+    # One trace per unique piece size, same inverted axes as the
+    # matplotlib view (length on x, width on y); NaN separates the
+    # sub-polygons within a trace
+    for color_idx in range(len(group_starts) - 1):
+        rows = sorted_arr[group_starts[color_idx]:group_starts[color_idx + 1]]
+        width, length = rows[0, 2], rows[0, 3]
+        x = rows[:, 0]
+        y = rows[:, 1]
+        gap = np.full(len(rows), np.nan)
+        xs = np.column_stack([y, y + length, y + length, y, y, gap]).ravel()
+        ys = np.column_stack([x, x, x + width, x + width, x, gap]).ravel()
+
+        fig.add_trace(go.Scatter(
+            x=xs, y=ys,
+            fill='toself',
+            mode='lines',
+            line=dict(color='black', width=1),
+            fillcolor=palette[color_idx % len(palette)],
+            opacity=0.7,
+            name=_LEGEND_FMT(
+                w=width / conversion, l=length / conversion, u=unit, n=len(rows)
+            ),
+            hoverinfo='name'
+        ))
+
+    # Roll outline
+    fig.add_shape(
+        type='rect', x0=0, y0=0, x1=roll_length, y1=roll_width,
+        line=dict(color='black', width=2)
+    )
+
+    total_area = roll_width * roll_length
+    used_area = float((arr[:, 2] * arr[:, 3]).sum())
+    utilization = used_area / total_area * 100 if total_area else 0.0
+
+    fig.update_layout(
+        title=(
+            f"Cutting Pattern - Roll: {roll_width/conversion:.3f}×"
+            f"{roll_length/conversion:.3f} {unit} — "
+            f"Material Usage: {utilization:.2f}%"
+        ),
+        xaxis=dict(title=f"Length ({unit})", range=[0, roll_length]),
+        yaxis=dict(title=f"Width ({unit})", range=[roll_width, 0]),
+        legend=dict(title="Piece Dimensions (Quantity)", orientation='h', y=-0.2),
+        template='plotly_white'
+    )
 
     return fig